@@ -9,25 +9,64 @@ from typing import List, Dict, Optional
 from datetime import datetime
 
 
+# Chromium timestamps count microseconds since 1601-01-01
+CHROME_EPOCH_OFFSET = 11644473600
+
+
+def chrome_time_to_unix(value) -> Optional[float]:
+    """Convert a Chromium timestamp string to unix seconds (None if unset)"""
+    try:
+        microseconds = int(value or 0)
+    except (TypeError, ValueError):
+        return None
+    if microseconds <= 0:
+        return None
+    return microseconds / 1000000 - CHROME_EPOCH_OFFSET
+
+
 class Bookmark:
     """Represents a single bookmark"""
     
-    def __init__(self, name: str, url: str, folder: str = "", date_added: Optional[int] = None):
+    def __init__(self, name: str, url: str, folder: str = "", date_added: Optional[int] = None,
+                 id: str = "", date_last_used: Optional[int] = None):
         self.name = name
         self.url = url
         self.folder = folder
         self.date_added = date_added
+        self.id = id
+        self.date_last_used = date_last_used
     
     def __repr__(self):
         return f"Bookmark(name='{self.name}', url='{self.url}', folder='{self.folder}')"
 
 
+class FolderNode:
+    """
+    A folder in the bookmark tree
+    Bookmarks are collected depth-first, so every bookmark below a folder
+    lives in the contiguous slice bookmarks[start:end]
+    """
+    
+    def __init__(self, name: str, path: str, id: str = "", parent: Optional['FolderNode'] = None):
+        self.name = name
+        self.path = path
+        self.id = id
+        self.parent = parent
+        self.children: List['FolderNode'] = []
+        self.start = 0
+        self.end = 0
+    
+    def __repr__(self):
+        return f"FolderNode(path='{self.path}', range=[{self.start}, {self.end}))"
+
+
 class BookmarkParser:
     """Parser for Edge/Chrome bookmark JSON files"""
     
     def __init__(self, bookmark_path: str):
         self.bookmark_path = Path(bookmark_path)
         self.bookmarks: List[Bookmark] = []
+        self.folders: List[FolderNode] = []
         self._last_modified: Optional[float] = None
     
     def parse(self) -> List[Bookmark]:
@@ -39,23 +78,30 @@ class BookmarkParser:
             data = json.load(f)
         
         self.bookmarks = []
+        self.folders = []
         
         # Parse bookmark roots (bookmark_bar, other, synced)
         roots = data.get('roots', {})
         for root_name, root_data in roots.items():
             if isinstance(root_data, dict) and root_data.get('type') == 'folder':
-                self._parse_folder(root_data, folder_path="")
+                self._parse_folder(root_data, folder_path="", parent=None)
         
         # Update last modified time
         self._last_modified = self.bookmark_path.stat().st_mtime
         
         return self.bookmarks
     
-    def _parse_folder(self, folder: Dict, folder_path: str):
-        """Recursively parse a bookmark folder"""
+    def _parse_folder(self, folder: Dict, folder_path: str, parent: Optional[FolderNode]):
+        """Recursively parse a bookmark folder and record its subtree range"""
         folder_name = folder.get('name', '')
         current_path = f"{folder_path}/{folder_name}" if folder_path else folder_name
         
+        node = FolderNode(folder_name, current_path, id=str(folder.get('id', '')), parent=parent)
+        node.start = len(self.bookmarks)
+        self.folders.append(node)
+        if parent is not None:
+            parent.children.append(node)
+        
         children = folder.get('children', [])
         for child in children:
             child_type = child.get('type')
@@ -66,13 +112,17 @@ class BookmarkParser:
                     name=child.get('name', ''),
                     url=child.get('url', ''),
                     folder=current_path,
-                    date_added=child.get('date_added')
+                    date_added=child.get('date_added'),
+                    id=str(child.get('id', '')),
+                    date_last_used=child.get('date_last_used')
                 )
                 self.bookmarks.append(bookmark)
             
             elif child_type == 'folder':
                 # It's a subfolder, recurse
-                self._parse_folder(child, current_path)
+                self._parse_folder(child, current_path, node)
+        
+        node.end = len(self.bookmarks)
     
     def is_modified(self) -> bool:
         """Check if the bookmark file has been modified since last parse"""
@@ -15,10 +15,29 @@ TRIGGER_KEYWORD = "b"
 # Search settings
 MAX_RESULTS = 10
 FUZZY_THRESHOLD = 60  # Minimum score for fuzzy matching (0-100)
+FOLDER_SCOPE_PREFIX = "in:"  # "b in:work lsx" searches only inside the "work" folder
+
+# Per-query time budget in seconds (0 = unbounded)
+# When it runs out the best results so far are returned and the search
+# finishes in the background to fill the result cache
+SEARCH_TIME_BUDGET = 0.05
+
+# Parallel scoring for huge libraries
+# Worker processes are started only once the library has PARALLEL_MIN_CORPUS
+# bookmarks, smaller libraries always use the single-process path
+PARALLEL_WORKERS = max((os.cpu_count() or 1) - 1, 0)  # 0 disables parallel mode
+PARALLEL_MIN_CORPUS = 50000
+
+# Launch frecency (ranking boost for frequently and recently opened bookmarks)
+FRECENCY_PATH = os.path.expanduser("~/.local/share/krunner-edge-helper/frecency.json")
+FRECENCY_HALF_LIFE_DAYS = 14  # A launch counts half as much after this many days
+FRECENCY_MAX_BOOST = 10  # Maximum score added to a bookmark's match score
+FRECENCY_MIN_SCORE = 0.01  # Entries that decayed below this are dropped on save
 
 # Cache settings
 CACHE_ENABLED = True
 CACHE_CHECK_INTERVAL = 2  # seconds
+RESULT_CACHE_SIZE = 64  # Number of recent queries whose full results are kept
 
 # Browser command
 # Try Flatpak first, fallback to system installation
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+KRunner Edge Helper CLI
+Replays queries against a bookmark file without D-Bus and prints
+ranked results with timings as JSON lines
+
+Examples:
+    printf 'b l\\nb ls\\nb lsx\\n' | python3 edge_helper_cli.py --bookmarks Bookmarks
+    python3 edge_helper_cli.py --bookmarks snapshot.json --queries trace.txt --tracemalloc
+    python3 -m cProfile -o cli.prof edge_helper_cli.py --queries trace.txt > results.jsonl
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import sys
+import time
+import tracemalloc
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from frecency import FrecencyTable
+from query_engine import QueryEngine
+from search_engine import SearchEngine
+import config
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Search Edge bookmarks without KRunner, one JSON line per query")
+    parser.add_argument('--bookmarks', default=config.DEFAULT_BOOKMARK_PATH,
+                        help="Edge Bookmarks file or a snapshot saved with --save-snapshot")
+    parser.add_argument('--queries', default='-',
+                        help="file with one query per line (default: stdin)")
+    parser.add_argument('--no-trigger', action='store_true',
+                        help=f"queries are bare search terms, prepend '{config.TRIGGER_KEYWORD} ' to each")
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help="per-query time budget in seconds (default: config, 0 = unbounded)")
+    parser.add_argument('--frecency', default=None,
+                        help="frecency table to rank with (default: none, for reproducible runs)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="parallel scoring workers (default: config, 0 = single process)")
+    parser.add_argument('--save-snapshot', metavar='PATH', default=None,
+                        help="copy the bookmark file to PATH so a trace can be replayed on the same data")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="report current and peak traced memory per query")
+    return parser.parse_args(argv)
+
+
+def read_queries(path):
+    """Yield queries from a file or stdin, one per line"""
+    stream = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        for line in stream:
+            query = line.rstrip('\n')
+            if query:
+                yield query
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def run(args, out) -> int:
+    """
+    Load the bookmarks, replay the queries and write one JSON line per query to `out`
+    Returns: exit code, non-zero if the bookmark file is missing or cannot be parsed
+    """
+    if not os.path.isfile(args.bookmarks):
+        print(f"Error: bookmark file not found at {args.bookmarks}")
+        return 1
+    
+    if args.tracemalloc:
+        tracemalloc.start()
+    
+    start = time.perf_counter()
+    frecency = FrecencyTable(args.frecency) if args.frecency else None
+    engine = QueryEngine(args.bookmarks, frecency, SearchEngine(frecency, parallel_workers=args.workers))
+    load_ms = (time.perf_counter() - start) * 1000
+    if not engine.loaded:
+        print(f"Error: could not load bookmarks from {args.bookmarks}")
+        return 1
+    print(f"Load took {load_ms:.1f} ms")
+    
+    if args.save_snapshot:
+        shutil.copyfile(args.bookmarks, args.save_snapshot)
+        print(f"Snapshot saved to {args.save_snapshot}")
+    
+    for query in read_queries(args.queries):
+        if args.no_trigger:
+            query = f"{config.TRIGGER_KEYWORD} {query}"
+        
+        if args.tracemalloc:
+            tracemalloc.reset_peak()
+        
+        start = time.perf_counter()
+        results = engine.search(query, args.time_budget)
+        matches = [engine.format_match(bookmark, score) for bookmark, score in results]
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        record = {
+            'query': query,
+            'elapsed_ms': round(elapsed_ms, 3),
+            'partial': results.partial,
+            'results': [
+                {
+                    'id': match_id,
+                    'text': text,
+                    'subtext': properties['subtext'],
+                    'score': score,
+                    'relevance': round(relevance, 4),
+                }
+                for (match_id, text, icon, match_type, relevance, properties), (bookmark, score)
+                in zip(matches, results)
+            ],
+        }
+        if args.tracemalloc:
+            current, peak = tracemalloc.get_traced_memory()
+            record['memory'] = {'current_kb': current // 1024, 'peak_kb': peak // 1024}
+        
+        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        out.flush()
+    
+    return 0
+
+
+def main(argv=None):
+    """Main entry point"""
+    args = parse_args(argv)
+    out = sys.stdout
+    
+    # Keep stdout for JSON lines, status messages go to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        return run(args, out)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Frecency Table - launch history for ranking
+Remembers how often and how recently each bookmark was opened
+"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import config
+
+
+class FrecencyTable:
+    """
+    Launch counts keyed on bookmark node id with exponential decay
+    Each entry stores (score, timestamp); the decay since `timestamp` is
+    only applied when the entry is read or updated
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else None
+        self._entries: Dict[str, Tuple[float, float]] = {}
+        # Bumped on every change so callers can tell when to recompute boosts
+        self.version = 0
+        self.load()
+    
+    def load(self):
+        """Load the table from disk, starting empty if it is missing or broken"""
+        self._entries = {}
+        if self.path is None or not self.path.exists():
+            return
+        
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for node_id, (score, timestamp) in data.get('entries', {}).items():
+                self._entries[str(node_id)] = (float(score), float(timestamp))
+        except Exception as e:
+            print(f"Error loading frecency table: {e}")
+            self._entries = {}
+        
+        self.version += 1
+    
+    def save(self):
+        """Write the table to disk, dropping entries that have decayed away"""
+        if self.path is None:
+            return
+        
+        now = time.time()
+        entries = {
+            node_id: [round(self._decay(score, timestamp, now), 4), now]
+            for node_id, (score, timestamp) in self._entries.items()
+            if self._decay(score, timestamp, now) >= config.FRECENCY_MIN_SCORE
+        }
+        
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'entries': entries}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving frecency table: {e}")
+    
+    def record(self, node_id: str, now: Optional[float] = None):
+        """Record one launch of a bookmark and persist the table"""
+        if not node_id:
+            return
+        
+        now = time.time() if now is None else now
+        score = self.score(node_id, now=now)
+        self._entries[node_id] = (score + 1.0, now)
+        self.version += 1
+        self.save()
+    
+    def score(self, node_id: str, last_used: Optional[float] = None, now: Optional[float] = None) -> float:
+        """
+        Decayed launch score of a bookmark
+        Bookmarks never launched through the plugin count as one launch at
+        `last_used` (Edge's own last-used time, unix seconds) if given
+        """
+        now = time.time() if now is None else now
+        
+        if node_id in self._entries:
+            score, timestamp = self._entries[node_id]
+            return self._decay(score, timestamp, now)
+        
+        if last_used:
+            return self._decay(1.0, last_used, now)
+        
+        return 0.0
+    
+    def boost(self, node_id: str, last_used: Optional[float] = None, now: Optional[float] = None) -> int:
+        """
+        Ranking boost for a bookmark (0 to config.FRECENCY_MAX_BOOST)
+        Saturates so a handful of launches already counts for most of it
+        """
+        score = self.score(node_id, last_used, now)
+        return int(round(config.FRECENCY_MAX_BOOST * score / (score + 1.0)))
+    
+    def _decay(self, score: float, timestamp: float, now: float) -> float:
+        """Apply exponential decay with a half life of config.FRECENCY_HALF_LIFE_DAYS"""
+        elapsed_days = max(now - timestamp, 0) / 86400
+        return score * 0.5 ** (elapsed_days / config.FRECENCY_HALF_LIFE_DAYS)
@@ -15,8 +15,8 @@ from typing import List, Tuple
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from bookmark_parser import BookmarkParser, Bookmark
-from search_engine import SearchEngine
+from frecency import FrecencyTable
+from query_engine import QueryEngine
 import config
 
 
@@ -37,26 +37,9 @@ class KRunnerEdgeHelper(dbus.service.Object):
         super().__init__(bus_name, OBJECT_PATH)
         
         # Initialize components
-        self.parser = BookmarkParser(config.DEFAULT_BOOKMARK_PATH)
-        self.search_engine = SearchEngine()
-        self.bookmarks = []
+        self.engine = QueryEngine(config.DEFAULT_BOOKMARK_PATH, FrecencyTable(config.FRECENCY_PATH))
         
-        # Load bookmarks
-        self._load_bookmarks()
-        
-        print(f"KRunner Edge Helper initialized with {len(self.bookmarks)} bookmarks")
-    
-    def _load_bookmarks(self):
-        """Load bookmarks from file"""
-        try:
-            self.bookmarks = self.parser.get_bookmarks()
-            print(f"Loaded {len(self.bookmarks)} bookmarks")
-        except FileNotFoundError:
-            print(f"Warning: Bookmark file not found at {config.DEFAULT_BOOKMARK_PATH}")
-            self.bookmarks = []
-        except Exception as e:
-            print(f"Error loading bookmarks: {e}")
-            self.bookmarks = []
+        print(f"KRunner Edge Helper initialized with {len(self.engine.bookmarks)} bookmarks")
     
     @dbus.service.method(IFACE, in_signature='s', out_signature='a(sssida{sv})', async_callbacks=('ok_callback', 'err_callback'))
     def Match(self, query: str, ok_callback, err_callback):
@@ -66,62 +49,7 @@ class KRunnerEdgeHelper(dbus.service.Object):
         - relevance: int32 (0 to 100)
         """
         try:
-            # Check if query starts with trigger keyword
-            if not query.startswith(config.TRIGGER_KEYWORD + " "):
-                return ok_callback([])
-            
-            # Remove trigger keyword
-            search_query = query[len(config.TRIGGER_KEYWORD) + 1:].strip()
-            
-            if not search_query:
-                return ok_callback([])
-            
-            # Reload bookmarks if modified
-            if self.parser.is_modified():
-                self._load_bookmarks()
-            
-            # Search bookmarks
-            results = self.search_engine.search(self.bookmarks, search_query)
-            
-            # Convert to KRunner format
-            matches = []
-            for i, (bookmark, score) in enumerate(results):
-                match_id = f"bookmark_{i}_{bookmark.url}"
-                
-                # Format display text
-                text = bookmark.name
-                if bookmark.folder:
-                    subtext = f"{bookmark.folder} | {bookmark.url}"
-                else:
-                    subtext = bookmark.url
-                
-                # Normalize relevance (0 to 100) as int32
-                relevance = int(min(score, 100))
-                
-                # Relevance score as double (0.0 to 1.0)
-                relevance_score = min(score / 100.0, 1.0)
-                
-                # Icon
-                icon = 'internet-web-browser'
-                
-                # Properties dictionary
-                properties = {
-                    'subtext': subtext,
-                    'urls': [bookmark.url]
-                }
-                
-                # Create match tuple: (id, text, icon, match_type(int), relevance(double), properties(dict))
-                match = (
-                    match_id,
-                    text,
-                    icon,
-                    relevance,
-                    relevance_score,
-                    properties
-                )
-                matches.append(match)
-            
-            return ok_callback(matches)
+            return ok_callback(self.engine.match(query))
             
         except Exception as e:
             print(f"Error in Match: {e}")
@@ -135,14 +63,11 @@ class KRunnerEdgeHelper(dbus.service.Object):
         Execute the selected match
         Opens the bookmark in Edge browser
         """
-        # Extract URL from match_id
-        # Format: bookmark_<index>_<url>
-        parts = match_id.split('_', 2)
-        if len(parts) < 3:
+        # Record the launch and extract URL from match_id
+        url = self.engine.launch(match_id)
+        if not url:
             return
         
-        url = parts[2]
-        
         # Try browser commands in order
         for browser_cmd in config.BROWSER_COMMANDS:
             try:
@@ -0,0 +1,215 @@
+"""
+Parallel Search - sharded scoring across a process pool
+The bookmark names and folders live in one shared memory block, the
+frecency boosts in another; persistent workers map both and score
+shards of candidates straight from the shared buffers
+"""
+import atexit
+import math
+import multiprocessing
+from array import array
+from multiprocessing import shared_memory
+from typing import Iterator, List, Optional, Tuple
+
+from bookmark_parser import Bookmark
+
+
+# Shards per worker, more shards give the deadline finer granularity
+SHARDS_PER_WORKER = 4
+
+# Candidates in the first shard of a query, later shards double up to the even split
+FIRST_SHARD_SIZE = 256
+
+# How many candidates a worker scores between two checks for a newer query
+CANCEL_CHECK_INTERVAL = 256
+
+# Seconds a new pool gets to answer its first task before it is given up on
+WORKER_START_TIMEOUT = 30
+
+# Layout of the corpus block: [offsets: uint64 * (2n + 1)][utf-8 blob]
+# Layout of the boosts block: [boosts: int32 * n]
+OFFSET_TYPE = 'Q'
+BOOST_TYPE = 'i'
+
+
+class ShardedScorer:
+    """Scores candidates in a persistent worker pool over a shared memory corpus"""
+    
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._pool = None
+        self._generation = None
+        self._corpus: Optional[shared_memory.SharedMemory] = None
+        self._boost_block: Optional[shared_memory.SharedMemory] = None
+        self._source: Optional[List[Bookmark]] = None
+        self._boosts: Optional[array] = None
+        self._count = 0
+        atexit.register(self.close)
+    
+    def load(self, bookmarks: List[Bookmark], boosts: List[int]):
+        """
+        Publish the corpus to the workers (called when bookmarks or boosts change)
+        The text is only encoded again after a bookmark reload, a boost change
+        just replaces the small boosts block
+        """
+        if bookmarks is not self._source or self._corpus is None:
+            encoded = []
+            offsets = array(OFFSET_TYPE, [0])
+            total = 0
+            for bookmark in bookmarks:
+                for text in (bookmark.name, bookmark.folder):
+                    data = text.encode('utf-8')
+                    encoded.append(data)
+                    total += len(data)
+                    offsets.append(total)
+            
+            self._corpus = _replace_block(self._corpus, offsets.tobytes() + b''.join(encoded))
+            self._source = bookmarks
+            self._count = len(bookmarks)
+        
+        boost_array = array(BOOST_TYPE, boosts)
+        if boost_array != self._boosts or self._boost_block is None:
+            self._boost_block = _replace_block(self._boost_block, boost_array.tobytes())
+            self._boosts = boost_array
+        
+        if self._pool is None:
+            # spawn avoids forking the GLib/D-Bus state of the main process
+            context = multiprocessing.get_context('spawn')
+            self._generation = context.Value('q', 0, lock=False)
+            self._pool = context.Pool(self.workers, initializer=_init_worker, initargs=(self._generation,))
+            
+            # Workers that fail to start are respawned forever, so make sure one answers
+            try:
+                self._pool.apply_async(_ping).get(WORKER_START_TIMEOUT)
+            except Exception as e:
+                self.close()
+                raise RuntimeError(f"worker processes did not start: {e!r}")
+    
+    def cancel(self, generation: int):
+        """Mark the shards of every query older than `generation` as stale"""
+        if self._generation is not None:
+            self._generation.value = generation
+    
+    def submit(self, keywords: List[str], order: List[int], top_k: int, threshold: int,
+               generation: int) -> Tuple[Iterator[List[Tuple[int, int]]], int]:
+        """
+        Split candidates (in priority order) into shards and score them in the pool
+        Workers skip shards once a query newer than `generation` was started
+        Returns: (iterator of per-shard top-K (index, score) lists in shard order, shard count)
+        """
+        self.cancel(generation)
+        shard_size = max(math.ceil(len(order) / (self.workers * SHARDS_PER_WORKER)), 1)
+        indices = array('I', order).tobytes()
+        item_size = array('I').itemsize
+        
+        # Shards start small and double in size, so the highest priority
+        # candidates come back well within the time budget
+        tasks = []
+        start, size = 0, min(FIRST_SHARD_SIZE, shard_size)
+        while start < len(order):
+            tasks.append((self._corpus.name, self._boost_block.name, self._count, keywords,
+                          indices[start * item_size:(start + size) * item_size], top_k, threshold, generation))
+            start += size
+            size = min(size * 2, shard_size)
+        return self._pool.imap(_score_shard, tasks), len(tasks)
+    
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        self._corpus = _replace_block(self._corpus, None)
+        self._boost_block = _replace_block(self._boost_block, None)
+        self._source = None
+        self._boosts = None
+
+
+def _replace_block(old: Optional[shared_memory.SharedMemory],
+                   data: Optional[bytes]) -> Optional[shared_memory.SharedMemory]:
+    """
+    Copy data into a new shared block and free the old one
+    Workers still mapping the old block keep it until they switch over
+    """
+    block = None
+    if data is not None:
+        block = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        block.buf[:len(data)] = data
+    if old is not None:
+        old.close()
+        old.unlink()
+    return block
+
+
+# Worker process state: the mapped blocks as (name, SharedMemory, views),
+# a scorer with a warm pinyin cache and the newest query generation
+_state = {'corpus': None, 'boosts': None, 'engine': None, 'generation': None}
+
+
+def _init_worker(generation):
+    """Pool initializer: set up the scorer in every worker before its first shard"""
+    from search_engine import SearchEngine
+    _state.update(engine=SearchEngine(parallel_workers=0), generation=generation)
+
+
+def _ping() -> bool:
+    return True
+
+
+def _map(key: str, name: str, layout) -> tuple:
+    """
+    Map a shared block into this worker without copying it (no-op if already mapped)
+    The block previously mapped under `key` is released
+    Returns: the views created by `layout` over the block's buffer
+    """
+    current = _state[key]
+    if current is not None and current[0] == name:
+        return current[2]
+    
+    shm = shared_memory.SharedMemory(name=name)
+    views = layout(shm.buf)
+    if current is not None:
+        for view in current[2]:
+            view.release()
+        current[1].close()
+    _state[key] = (name, shm, views)
+    return views
+
+
+def _score_shard(task) -> List[Tuple[int, int]]:
+    """Score one shard of candidate indices and return its local top-K"""
+    corpus_name, boosts_name, count, keywords, indices_bytes, top_k, threshold, generation = task
+    current = _state['generation']
+    if current.value != generation:
+        # A newer query was started, nobody is waiting for this shard
+        return []
+    
+    offsets_size = array(OFFSET_TYPE).itemsize * (2 * count + 1)
+    boosts_size = array(BOOST_TYPE).itemsize * count
+    try:
+        offsets, blob = _map('corpus', corpus_name,
+                             lambda buf: (buf[:offsets_size].cast(OFFSET_TYPE), buf[offsets_size:]))
+        boosts, = _map('boosts', boosts_name, lambda buf: (buf[:boosts_size].cast(BOOST_TYPE),))
+    except FileNotFoundError:
+        # The corpus was replaced by a reload, this query is stale
+        return []
+    
+    indices = array('I')
+    indices.frombytes(indices_bytes)
+    engine = _state['engine']
+    
+    # Texts are decoded one candidate at a time, so no worker holds a copy of the corpus
+    candidate = Bookmark('', '')
+    results = []
+    for position, index in enumerate(indices):
+        if position % CANCEL_CHECK_INTERVAL == 0 and current.value != generation:
+            return []
+        name_start, folder_start, end = offsets[2 * index], offsets[2 * index + 1], offsets[2 * index + 2]
+        candidate.name = str(blob[name_start:folder_start], 'utf-8')
+        candidate.folder = str(blob[folder_start:end], 'utf-8')
+        score = engine._calculate_score(candidate, keywords)
+        if score >= threshold:
+            results.append((index, score, boosts[index], candidate.name))
+    
+    # Same ordering as SearchEngine._top so the merged shards rank identically
+    results.sort(key=lambda x: (-x[1], -x[2], len(x[3]), x[3].lower(), x[0]))
+    return [(index, score + boost) for index, score, boost, name in results[:top_k]]
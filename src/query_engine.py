@@ -0,0 +1,134 @@
+"""
+Query Engine - bookmark search without D-Bus
+Handles the trigger keyword, bookmark reloading and KRunner result formatting
+so the same plumbing can be driven by the D-Bus service, the CLI and tests
+"""
+from typing import List, Optional, Tuple
+
+from bookmark_parser import BookmarkParser, Bookmark
+from frecency import FrecencyTable
+from search_engine import SearchEngine, SearchResults
+import config
+
+
+# KRunner match tuple: (id, text, icon, match_type(int), relevance(double), properties(dict))
+Match = Tuple[str, str, str, int, float, dict]
+
+
+class QueryEngine:
+    """Headless search engine for KRunner queries"""
+    
+    def __init__(self, bookmark_path: str = config.DEFAULT_BOOKMARK_PATH,
+                 frecency: Optional[FrecencyTable] = None,
+                 search_engine: Optional[SearchEngine] = None,
+                 trigger: str = config.TRIGGER_KEYWORD):
+        self.parser = BookmarkParser(bookmark_path)
+        self.frecency = frecency
+        self.search_engine = search_engine or SearchEngine(frecency)
+        self.trigger = trigger
+        self.bookmarks: List[Bookmark] = []
+        self.folders = []
+        
+        # Load bookmarks
+        self.loaded = self.load()
+    
+    def load(self) -> bool:
+        """
+        Load bookmarks from file
+        Returns: False if the file is missing or cannot be parsed (no bookmarks are loaded)
+        """
+        try:
+            self.bookmarks = self.parser.get_bookmarks()
+            self.folders = self.parser.folders
+            print(f"Loaded {len(self.bookmarks)} bookmarks")
+            return True
+        except FileNotFoundError:
+            print(f"Warning: Bookmark file not found at {self.parser.bookmark_path}")
+        except Exception as e:
+            print(f"Error loading bookmarks: {e}")
+        self.bookmarks = []
+        self.folders = []
+        return False
+    
+    def strip_trigger(self, query: str) -> Optional[str]:
+        """Return the search part of a KRunner query, None if it is not for this plugin"""
+        # Check if query starts with trigger keyword
+        if not query.startswith(self.trigger + " "):
+            return None
+        
+        # Remove trigger keyword
+        search_query = query[len(self.trigger) + 1:].strip()
+        return search_query or None
+    
+    def search(self, query: str, time_budget: Optional[float] = None) -> SearchResults:
+        """Search bookmarks for a full KRunner query (including the trigger keyword)"""
+        search_query = self.strip_trigger(query)
+        if search_query is None:
+            return SearchResults()
+        
+        # Reload bookmarks if modified
+        if self.parser.is_modified():
+            self.loaded = self.load()
+        
+        return self.search_engine.search(self.bookmarks, search_query, self.folders, time_budget)
+    
+    def match(self, query: str) -> List[Match]:
+        """Search and convert the results to KRunner match tuples"""
+        return [self.format_match(bookmark, score) for bookmark, score in self.search(query)]
+    
+    def format_match(self, bookmark: Bookmark, score: int) -> Match:
+        """Convert one search result to a KRunner match tuple"""
+        match_id = f"bookmark_{bookmark.id}_{bookmark.url}"
+        
+        # Format display text
+        text = bookmark.name
+        if bookmark.folder:
+            subtext = f"{bookmark.folder} | {bookmark.url}"
+        else:
+            subtext = bookmark.url
+        
+        # Split the frecency boost back off the match score
+        boost = self.search_engine.boost_of(bookmark)
+        base = min(score - boost, 100)
+        
+        # Normalize relevance (0 to 100) as int32
+        relevance = int(base)
+        
+        # Relevance score as double (0.0 to 1.0)
+        # The boost adds less than one score point, so it only orders equal matches,
+        # the same way SearchEngine ranks them
+        relevance_score = min((base + boost / (config.FRECENCY_MAX_BOOST + 1.0)) / 100.0, 1.0)
+        
+        # Icon
+        icon = 'internet-web-browser'
+        
+        # Properties dictionary
+        properties = {
+            'subtext': subtext,
+            'urls': [bookmark.url]
+        }
+        
+        return (
+            match_id,
+            text,
+            icon,
+            relevance,
+            relevance_score,
+            properties
+        )
+    
+    def launch(self, match_id: str) -> Optional[str]:
+        """
+        Record a launch of the matched bookmark
+        Returns: the bookmark URL, None if match_id is malformed
+        """
+        # Extract node id and URL from match_id
+        # Format: bookmark_<node id>_<url>
+        parts = match_id.split('_', 2)
+        if len(parts) < 3:
+            return None
+        
+        node_id, url = parts[1], parts[2]
+        if self.frecency is not None:
+            self.frecency.record(node_id)
+        return url
@@ -2,44 +2,511 @@
 Search Engine for Edge Bookmarks
 Combines fuzzy search and pinyin matching
 """
-from typing import List, Tuple
+import multiprocessing
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 from rapidfuzz import fuzz
-from bookmark_parser import Bookmark
+from bookmark_parser import Bookmark, FolderNode, chrome_time_to_unix
+from frecency import FrecencyTable
+from parallel_search import ShardedScorer
 from pinyin_matcher import PinyinMatcher
 import config
 
 
+# How many candidates are scored between two deadline checks
+DEADLINE_CHECK_INTERVAL = 64
+
+# Word boundaries for folder scope segments ("My Work", "工作 Docs", "edge-one")
+SCOPE_WORD_SEPARATOR = re.compile(r'[^a-z0-9\u4e00-\u9fff]+')
+
+# Frecency boosts decay over time, recompute them at least this often (seconds)
+BOOST_REFRESH_INTERVAL = 3600
+
+# Number of recent queries whose candidate lists are kept to narrow the next keystroke
+CANDIDATE_CACHE_SIZE = 8
+
+# How long a new query waits for a superseded background search to stop (seconds)
+SUPERSEDED_WAIT = 0.01
+
+# Longest wait for a single shard from the worker pool, even without a deadline (seconds)
+SHARD_TIMEOUT = 30
+
+
+class SearchResults(list):
+    """
+    List of (bookmark, score) tuples
+    `partial` is True when the time budget ran out before every candidate
+    was scored; the full result is then finished in the background
+    """
+    
+    def __init__(self, results=(), partial: bool = False):
+        super().__init__(results)
+        self.partial = partial
+
+
 class SearchEngine:
     """Fuzzy search engine with pinyin support"""
     
-    def __init__(self):
+    def __init__(self, frecency: Optional[FrecencyTable] = None,
+                 parallel_workers: Optional[int] = None, parallel_min_corpus: Optional[int] = None):
         self.pinyin_matcher = PinyinMatcher()
+        self.frecency = frecency
+        
+        # Optional process pool for huge libraries (defaults from config)
+        if parallel_workers is None:
+            parallel_workers = config.PARALLEL_WORKERS
+        self.parallel_min_corpus = (config.PARALLEL_MIN_CORPUS
+                                    if parallel_min_corpus is None else parallel_min_corpus)
+        self._parallel = ShardedScorer(parallel_workers) if parallel_workers > 0 else None
+        self._parallel_loaded = False
+        
+        # Per-bookmark frecency boost and candidate priority order,
+        # rebuilt when the bookmark list or the frecency table changes
+        self._source: Optional[List[Bookmark]] = None
+        self._frecency_version = None
+        self._prepared_at = 0.0
+        self._epoch = 0
+        self._boosts: List[int] = []
+        self._boost_by_id: dict = {}
+        self._order: List[int] = []
+        self._rank: List[int] = []
+        
+        # Full results of recent queries, filled by completed and background searches
+        self._cache: 'OrderedDict[Tuple[str, ...], List[Tuple[Bookmark, int]]]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._generation = 0
+        self._worker: Optional[threading.Thread] = None
+        self._worker_key: Optional[Tuple[str, ...]] = None
+        
+        # How far recent queries got: (scope, lowercase keywords) -> (order, scored, mentioned)
+        # where `mentioned` are the scored candidates containing every keyword
+        self._candidates: 'OrderedDict[tuple, Tuple[List[int], int, List[int]]]' = OrderedDict()
     
-    def search(self, bookmarks: List[Bookmark], query: str) -> List[Tuple[Bookmark, int]]:
+    def search(self, bookmarks: List[Bookmark], query: str,
+               folders: Optional[List[FolderNode]] = None,
+               time_budget: Optional[float] = None) -> SearchResults:
         """
         Search bookmarks with multi-keyword matching and pinyin support
+        A leading "/work/ci" or "in:工作" token limits the search to matching
+        folder subtrees (needs the parser's folder tree in `folders`)
+        Candidates are scored in priority order within `time_budget` seconds
+        (defaults to config.SEARCH_TIME_BUDGET, 0 means unbounded)
+        Scores include the bookmark's frecency boost
         Returns: List of (bookmark, score) tuples sorted by score descending
         """
         if not query:
-            return []
+            return SearchResults()
         
-        results = []
         query = query.strip()
         
         # Split query into keywords by space
         keywords = [kw.strip() for kw in query.split() if kw.strip()]
+        if not keywords:
+            return SearchResults()
+        
+        # A new query supersedes background work for older ones straight away,
+        # so stale threads stop competing for the interpreter with this search
+        cache_key = tuple(keywords)
+        if not self._background_running(cache_key):
+            self._generation += 1
+            if self._parallel_loaded:
+                self._parallel.cancel(self._generation)
+            # Give the superseded search a moment to record how far it got
+            if self._worker is not None and self._worker.is_alive():
+                self._worker.join(SUPERSEDED_WAIT)
+        
+        self._prepare(bookmarks)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return SearchResults(cached)
+        
+        # Resolve folder scope first, then search only inside that subtree
+        order = self._order
+        scope, keywords = self._split_scope(keywords)
+        scope_key = ()
+        if scope:
+            if folders is None:
+                # No folder index available, search folder names as plain keywords
+                keywords = scope + keywords
+            else:
+                scope_key = tuple(scope)
+                ranges, scope_score = self._resolve_scope(folders, scope)
+                order = sorted((i for start, end in ranges for i in range(start, end)),
+                               key=self._rank.__getitem__)
+                if not keywords:
+                    # Only a folder was given, list its bookmarks in priority order
+                    return SearchResults([(bookmarks[i], scope_score + self._boosts[i])
+                                          for i in order[:config.MAX_RESULTS]])
+        
+        if time_budget is None:
+            time_budget = config.SEARCH_TIME_BUDGET
+        deadline = time.monotonic() + time_budget if time_budget else None
+        
+        # Typing extends the previous query, start from what it left over
+        order = self._narrow(scope_key, keywords, order)
+        
+        if self._parallel_loaded and len(order) >= self.parallel_min_corpus:
+            try:
+                return self._search_parallel(bookmarks, order, keywords, cache_key, deadline)
+            except Exception as e:
+                print(f"Parallel search failed, falling back to single process: {e}")
+                self._disable_parallel()
+        
+        results, done, mentioned = self._score_candidates(bookmarks, self._boosts, order, keywords, deadline)
+        self._remember(scope_key, keywords, order, done, mentioned, self._epoch)
+        if done == len(order):
+            top = self._top(bookmarks, self._boosts, results)
+            self._cache_put(cache_key, top)
+            return SearchResults(top)
+        
+        # Out of time: answer with the best found so far, finish in the background
+        top = self._top(bookmarks, self._boosts, list(results))
+        if not self._background_running(cache_key):
+            self._start_background(cache_key, self._finish_search,
+                                   (bookmarks, self._boosts, order, done, keywords, results, mentioned,
+                                    cache_key, scope_key, self._generation, self._epoch))
+        return SearchResults(top, partial=True)
+    
+    def boost_of(self, bookmark: Bookmark) -> int:
+        """Frecency boost included in the bookmark's latest search score"""
+        return self._boost_by_id.get(bookmark.id, 0)
+    
+    def _search_parallel(self, bookmarks: List[Bookmark], order: List[int], keywords: List[str],
+                         cache_key: Tuple[str, ...], deadline: Optional[float]) -> SearchResults:
+        """Score shards in the worker pool and merge their local top-K lists"""
+        shards, count = self._parallel.submit(keywords, order, config.MAX_RESULTS, config.FUZZY_THRESHOLD,
+                                              self._generation)
+        results, done = self._collect_shards(shards, count, deadline)
+        if done == count:
+            top = self._top(bookmarks, self._boosts, results)
+            self._cache_put(cache_key, top)
+            return SearchResults(top)
+        
+        # Out of time: the pool keeps going, collect the remaining shards in the background
+        top = self._top(bookmarks, self._boosts, list(results))
+        if not self._background_running(cache_key):
+            self._start_background(cache_key, self._finish_parallel,
+                                   (bookmarks, self._boosts, shards, count - done, results, cache_key,
+                                    self._generation, self._epoch))
+        return SearchResults(top, partial=True)
+    
+    def _collect_shards(self, shards, count: int, deadline: Optional[float],
+                        generation: Optional[int] = None) -> Tuple[List[Tuple[int, int]], int]:
+        """
+        Collect per-shard results in shard order until the deadline passes
+        or a newer query supersedes this one
+        Returns: (merged (index, score) tuples, number of shards collected)
+        """
+        results = []
+        
+        for done in range(count):
+            if generation is not None and generation != self._generation:
+                return results, done
+            timeout = SHARD_TIMEOUT
+            if deadline is not None:
+                timeout = min(max(deadline - time.monotonic(), 0), SHARD_TIMEOUT)
+            try:
+                shard = shards.next(timeout)
+            except multiprocessing.TimeoutError:
+                if deadline is None or time.monotonic() < deadline:
+                    raise RuntimeError(f"no shard from the worker pool within {SHARD_TIMEOUT} s")
+                return results, done
+            results.extend(shard)
+        
+        return results, count
+    
+    def _background_running(self, cache_key: Tuple[str, ...]) -> bool:
+        """Whether a background search for this query is still running"""
+        return bool(self._worker and self._worker.is_alive() and self._worker_key == cache_key)
+    
+    def _start_background(self, cache_key: Tuple[str, ...], target, args: tuple):
+        self._worker_key = cache_key
+        self._worker = threading.Thread(target=target, args=args, daemon=True)
+        self._worker.start()
+    
+    def _prepare(self, bookmarks: List[Bookmark]):
+        """Precompute frecency boosts and the candidate priority order"""
+        frecency_version = self.frecency.version if self.frecency is not None else None
+        now = time.time()
+        if (bookmarks is self._source and len(self._order) == len(bookmarks)
+                and frecency_version == self._frecency_version
+                and now - self._prepared_at < BOOST_REFRESH_INTERVAL):
+            return
+        
+        if self.frecency is not None:
+            self._boosts = [
+                self.frecency.boost(bookmark.id, chrome_time_to_unix(bookmark.date_last_used), now)
+                for bookmark in bookmarks
+            ]
+        else:
+            self._boosts = [0] * len(bookmarks)
+        self._boost_by_id = {bookmark.id: boost for bookmark, boost in zip(bookmarks, self._boosts) if boost}
+        
+        # Frequently launched, then recently added bookmarks are scored first
+        self._order = sorted(range(len(bookmarks)),
+                             key=lambda i: (-self._boosts[i], -int(bookmarks[i].date_added or 0)))
+        self._rank = [0] * len(bookmarks)
+        for position, index in enumerate(self._order):
+            self._rank[index] = position
+        
+        # Publish the corpus to the worker pool if the library is large enough
+        self._parallel_loaded = False
+        if self._parallel is not None and len(bookmarks) >= self.parallel_min_corpus:
+            try:
+                self._parallel.load(bookmarks, self._boosts)
+                self._parallel_loaded = True
+            except Exception as e:
+                print(f"Error starting parallel search: {e}")
+                self._disable_parallel()
+        
+        self._source = bookmarks
+        self._frecency_version = frecency_version
+        self._prepared_at = now
+        with self._cache_lock:
+            self._epoch += 1
+            self._cache.clear()
+            self._candidates.clear()
+    
+    def _disable_parallel(self):
+        """Stop the worker pool and stay single-process for the rest of the session"""
+        self._parallel_loaded = False
+        if self._parallel is not None:
+            self._parallel.close()
+            self._parallel = None
+    
+    def _score_candidates(self, bookmarks: List[Bookmark], boosts: List[int], order: List[int],
+                          keywords: List[str],
+                          deadline: Optional[float],
+                          generation: Optional[int] = None) -> Tuple[List[Tuple[int, int]], int, List[int]]:
+        """
+        Score candidates in the given order until the deadline passes
+        or a newer background search supersedes this one
+        Returns: (matching (index, score) tuples, number of candidates scored,
+                  scored candidates that contain every keyword)
+        """
+        results = []
+        mentioned = []
+        words = [keyword.lower() for keyword in keywords]
         
-        for bookmark in bookmarks:
+        for position, index in enumerate(order):
+            if position % DEADLINE_CHECK_INTERVAL == 0 and position:
+                if deadline is not None and time.monotonic() > deadline:
+                    return results, position, mentioned
+                if generation is not None and generation != self._generation:
+                    return results, position, mentioned
+            
+            bookmark = bookmarks[index]
+            if not all(self._mentions(bookmark, word) for word in words):
+                continue
+            mentioned.append(index)
             score = self._calculate_score(bookmark, keywords)
             
             if score >= config.FUZZY_THRESHOLD:
-                results.append((bookmark, score))
+                results.append((index, score + boosts[index]))
+        
+        return results, len(order), mentioned
+    
+    def _finish_search(self, bookmarks: List[Bookmark], boosts: List[int], order: List[int], done: int,
+                       keywords: List[str], results: List[Tuple[int, int]], mentioned: List[int],
+                       cache_key: Tuple[str, ...], scope_key: tuple, generation: int, epoch: int):
+        """Score the remaining candidates of a partial search and cache the full result"""
+        rest, scored, rest_mentioned = self._score_candidates(bookmarks, boosts, order[done:], keywords,
+                                                              None, generation)
+        # Even when superseded, the next keystroke can start from here
+        self._remember(scope_key, keywords, order, done + scored, mentioned + rest_mentioned, epoch)
+        if done + scored < len(order):
+            return
+        
+        self._cache_put(cache_key, self._top(bookmarks, boosts, results + rest), epoch)
+    
+    def _mentions(self, bookmark: Bookmark, word: str) -> bool:
+        """
+        Whether a lowercase keyword occurs in the bookmark's name or folder,
+        or their pinyin; every matching tier of _score_text needs this
+        """
+        for text in (bookmark.name, bookmark.folder):
+            if not text:
+                continue
+            if word in text.lower():
+                return True
+            if self.pinyin_matcher.contains_chinese(text) and any(
+                    word in variation for variation in self.pinyin_matcher.get_pinyin_variations(text)):
+                return True
+        return False
+    
+    def _remember(self, scope_key: tuple, keywords: List[str], order: List[int], scored: int,
+                  mentioned: List[int], epoch: int):
+        """Keep how far a query got, so queries extending it can skip what cannot match"""
+        key = (scope_key, tuple(keyword.lower() for keyword in keywords))
+        with self._cache_lock:
+            if epoch != self._epoch:
+                return
+            # Keep whichever pass leaves the fewest candidates for the next keystroke
+            previous = self._candidates.get(key)
+            if (previous is None or len(mentioned) + len(order) - scored
+                    <= len(previous[2]) + len(previous[0]) - previous[1]):
+                self._candidates[key] = (order, scored, mentioned)
+            self._candidates.move_to_end(key)
+            while len(self._candidates) > CANDIDATE_CACHE_SIZE:
+                self._candidates.popitem(last=False)
+    
+    def _narrow(self, scope_key: tuple, keywords: List[str], order: List[int]) -> List[int]:
+        """
+        Candidates for a query, narrowed by an earlier query it extends
+        Every keyword of a match occurs in the bookmark's text or pinyin, so if
+        each keyword of an earlier query occurs inside one of ours, only the
+        candidates it found mentioned, plus those it never reached, can match
+        Returns: candidate indices in priority order
+        """
+        words = [keyword.lower() for keyword in keywords]
+        with self._cache_lock:
+            records = list(self._candidates.items())
         
-        # Sort by score descending, prefer shorter names when scores are close
-        results.sort(key=lambda x: (-x[1], len(x[0].name), x[0].name.lower()))
+        best = order
+        for (record_scope, record_words), (record_order, scored, mentioned) in records:
+            if record_scope != scope_key:
+                continue
+            if not all(any(earlier in word for word in words) for earlier in record_words):
+                continue
+            if len(mentioned) + len(record_order) - scored < len(best):
+                best = mentioned + record_order[scored:]
+        return best
+    
+    def _finish_parallel(self, bookmarks: List[Bookmark], boosts: List[int], shards, remaining: int,
+                         results: List[Tuple[int, int]], cache_key: Tuple[str, ...],
+                         generation: int, epoch: int):
+        """Collect the remaining shards of a partial parallel search and cache the full result"""
+        try:
+            rest, done = self._collect_shards(shards, remaining, None, generation)
+        except Exception as e:
+            print(f"Error in background parallel search: {e}")
+            return
+        # Shards skipped by the workers for a newer query come back empty
+        if done < remaining or generation != self._generation:
+            return
+        
+        self._cache_put(cache_key, self._top(bookmarks, boosts, results + rest), epoch)
+    
+    def _top(self, bookmarks: List[Bookmark], boosts: List[int],
+             results: List[Tuple[int, int]]) -> List[Tuple[Bookmark, int]]:
+        """Sort (index, score) results and keep the best config.MAX_RESULTS as (bookmark, score)"""
+        # Sort by match score (without the boost) descending, then by frecency boost,
+        # prefer shorter names when both are equal, fall back to bookmark order
+        # so ties never depend on the scoring order
+        results.sort(key=lambda x: (-(x[1] - boosts[x[0]]), -boosts[x[0]],
+                                    len(bookmarks[x[0]].name), bookmarks[x[0]].name.lower(), x[0]))
         
         # Limit results
-        return results[:config.MAX_RESULTS]
+        return [(bookmarks[index], score) for index, score in results[:config.MAX_RESULTS]]
+    
+    def _cache_get(self, key: Tuple[str, ...]) -> Optional[List[Tuple[Bookmark, int]]]:
+        with self._cache_lock:
+            if key not in self._cache:
+                return None
+            self._cache.move_to_end(key)
+            return self._cache[key]
+    
+    def _cache_put(self, key: Tuple[str, ...], results: List[Tuple[Bookmark, int]],
+                   epoch: Optional[int] = None):
+        """Cache a full result, dropped if computed for an older bookmark list (`epoch`)"""
+        with self._cache_lock:
+            if epoch is not None and epoch != self._epoch:
+                return
+            self._cache[key] = results
+            self._cache.move_to_end(key)
+            while len(self._cache) > config.RESULT_CACHE_SIZE:
+                self._cache.popitem(last=False)
+    
+    def _split_scope(self, keywords: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Split a leading folder scope token off the keywords
+        "/work/ci" and "in:work/ci" both become ["work", "ci"]
+        Returns: (folder segments, remaining keywords)
+        """
+        if not keywords:
+            return [], keywords
+        
+        first = keywords[0]
+        if first.lower().startswith(config.FOLDER_SCOPE_PREFIX):
+            path = first[len(config.FOLDER_SCOPE_PREFIX):]
+        elif first.startswith('/'):
+            path = first
+        else:
+            return [], keywords
+        
+        segments = [segment for segment in path.split('/') if segment]
+        if not segments:
+            return [], keywords
+        
+        return segments, keywords[1:]
+    
+    def _resolve_scope(self, folders: List[FolderNode], segments: List[str]) -> Tuple[List[Tuple[int, int]], int]:
+        """
+        Find folders whose name chain ends with the given segments
+        The first segment may match a folder at any depth, each following
+        segment must match a direct subfolder (pinyin supported)
+        Substring matches inside a word are not enough to select a folder
+        Returns: (merged bookmark index ranges, best folder match score)
+        """
+        matched = []
+        best_score = 0
+        
+        for folder in folders:
+            node = folder
+            scores = []
+            for segment in reversed(segments):
+                if node is None:
+                    break
+                score = self._score_segment(node.name, segment)
+                if not score:
+                    break
+                scores.append(score)
+                node = node.parent
+            
+            if len(scores) == len(segments) and folder.end > folder.start:
+                matched.append((folder.start, folder.end))
+                best_score = max(best_score, int(sum(scores) / len(scores)))
+        
+        # Merge nested or overlapping subtrees so no bookmark is visited twice
+        ranges = []
+        for start, end in sorted(matched):
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1] = (ranges[-1][0], max(ranges[-1][1], end))
+            else:
+                ranges.append((start, end))
+        
+        return ranges, best_score
+    
+    def _score_segment(self, name: str, segment: str) -> int:
+        """
+        Score a folder scope segment against a folder name
+        Only exact, prefix and word prefix matches count, on the name itself
+        and on its pinyin variations; a substring inside a word never does
+        Returns: 0 if the segment does not select the folder
+        """
+        segment = segment.lower()
+        if self.pinyin_matcher.contains_chinese(name):
+            texts = self.pinyin_matcher.get_pinyin_variations(name)
+        else:
+            texts = [name.lower()]
+        
+        best = 0
+        for i, text in enumerate(texts):
+            if text == segment:
+                score = 100
+            elif text.startswith(segment):
+                score = 90
+            elif any(word.startswith(segment) for word in SCOPE_WORD_SEPARATOR.split(text) if word):
+                score = 80
+            else:
+                continue
+            # Pinyin variations rank slightly below the name itself
+            best = max(best, score - i * 3)
+        
+        return best
     
     def _calculate_score(self, bookmark: Bookmark, keywords: List[str]) -> int:
         """Calculate relevance score for a bookmark with multi-keyword matching"""
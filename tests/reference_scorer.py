@@ -0,0 +1,168 @@
+"""
+Reference scorer for differential testing
+A frozen copy of the original single-pass search (SearchEngine.search,
+_calculate_score, _score_text and PinyinMatcher.score_match before any
+indexing, caching, time budget or parallel work). Do not optimize this
+file; it defines the scores and ordering the optimized engine must reproduce
+"""
+import re
+from typing import List, Tuple
+
+from pypinyin import lazy_pinyin, Style
+
+import config
+
+
+class ReferencePinyinMatcher:
+    """Original pinyin matching"""
+
+    def __init__(self):
+        self._pinyin_cache = {}
+
+    def get_pinyin_variations(self, text: str) -> List[str]:
+        if text in self._pinyin_cache:
+            return self._pinyin_cache[text]
+
+        full_pinyin = ''.join(lazy_pinyin(text, style=Style.NORMAL))
+        initials = ''.join(lazy_pinyin(text, style=Style.FIRST_LETTER))
+
+        variations = [
+            text.lower(),
+            full_pinyin.lower(),
+            initials.lower(),
+        ]
+
+        full_pinyin_spaced = ' '.join(lazy_pinyin(text, style=Style.NORMAL))
+        if full_pinyin_spaced != full_pinyin:
+            variations.append(full_pinyin_spaced.lower())
+
+        self._pinyin_cache[text] = variations
+        return variations
+
+    def contains_chinese(self, text: str) -> bool:
+        return any('\u4e00' <= char <= '\u9fff' for char in text)
+
+    def score_match(self, text: str, query: str) -> int:
+        query = query.lower()
+        text_lower = text.lower()
+
+        if self.contains_chinese(text):
+            variations = self.get_pinyin_variations(text)
+
+            for i, variation in enumerate(variations):
+                if query == variation:
+                    return 95 - (i * 3)
+                elif variation.startswith(query):
+                    return 88 - (i * 3)
+                elif query in variation:
+                    return 75 - (i * 3)
+
+        if query == text_lower:
+            return 100
+
+        if text_lower.startswith(query):
+            return 85
+
+        return 0
+
+
+class ReferenceScorer:
+    """Original multi-keyword scoring and ranking"""
+
+    def __init__(self):
+        self.pinyin_matcher = ReferencePinyinMatcher()
+
+    def search(self, bookmarks, query: str) -> List[Tuple[object, int]]:
+        if not query:
+            return []
+
+        results = []
+        query = query.strip()
+
+        keywords = [kw.strip() for kw in query.split() if kw.strip()]
+
+        for bookmark in bookmarks:
+            score = self.calculate_score(bookmark, keywords)
+
+            if score >= config.FUZZY_THRESHOLD:
+                results.append((bookmark, score))
+
+        results.sort(key=lambda x: (-x[1], len(x[0].name), x[0].name.lower()))
+
+        return results[:config.MAX_RESULTS]
+
+    def calculate_score(self, bookmark, keywords: List[str]) -> int:
+        if not keywords:
+            return 0
+
+        name_scores = []
+        folder_scores = []
+
+        for keyword in keywords:
+            name_score = self.score_text(bookmark.name, keyword)
+            folder_score = self.score_text(bookmark.folder, keyword)
+
+            if max(name_score, folder_score) == 0:
+                return 0
+
+            name_scores.append(name_score)
+            folder_scores.append(folder_score)
+
+        avg_name_score = sum(name_scores) / len(name_scores)
+        avg_folder_score = sum(folder_scores) / len(folder_scores)
+
+        total_score = max(avg_name_score, avg_folder_score)
+
+        if avg_name_score > 0 and avg_folder_score > 0:
+            total_score = min(total_score + 5, 100)
+
+        if all(score > 0 for score in name_scores):
+            total_score = total_score + 3
+
+        if bookmark.name and keywords:
+            name_lower = bookmark.name.lower()
+            if name_lower.startswith(keywords[0].lower()):
+                total_score = total_score + 2
+
+        return int(min(total_score, 100))
+
+    def score_text(self, text: str, keyword: str) -> float:
+        if not text:
+            return 0
+
+        keyword = keyword.lower()
+        text_lower = text.lower()
+
+        if self.pinyin_matcher.contains_chinese(text):
+            pinyin_score = self.pinyin_matcher.score_match(text, keyword)
+            if pinyin_score > 0:
+                return float(pinyin_score)
+
+        if keyword == text_lower:
+            return 100.0
+
+        word_pattern = r'\b' + re.escape(keyword) + r'\b'
+        match = re.search(word_pattern, text_lower)
+        if match:
+            if text_lower.startswith(keyword + ' ') or text_lower.startswith(keyword + '-') or text_lower.startswith(keyword + '_'):
+                return 98.0
+            if text_lower.startswith(keyword):
+                return 92.0
+            return 95.0
+
+        if text_lower.startswith(keyword):
+            return 85.0
+
+        words = re.split(r'[^a-z0-9]+', text_lower)
+        for i, word in enumerate(words):
+            if word and word.startswith(keyword):
+                return 80.0 - (i * 2)
+
+        if len(keyword) >= 2 and keyword in text_lower:
+            for i, word in enumerate(words):
+                if word and keyword in word and not word.startswith(keyword):
+                    pos = word.find(keyword)
+                    if pos <= 3:
+                        return 65.0 - (i * 2) - (pos * 2)
+
+        return 0
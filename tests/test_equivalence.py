@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Differential equivalence test: optimized SearchEngine vs the frozen reference scorer
+
+Generates mixed CJK/Latin bookmark libraries and type-ahead query sequences,
+replays them through the optimized engine (single process, result cache,
+time budget, parallel pool, empty frecency table, folder scope) and asserts
+identical scores and ordering.
+A mismatch is shrunk to a minimal counterexample before it is reported.
+
+Longer runs:
+    python3 tests/test_equivalence.py --iterations 500 --seed 1234
+"""
+import argparse
+import ast
+import os
+import random
+import sys
+import time
+
+# Add source directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pypinyin import lazy_pinyin, Style
+
+from bookmark_parser import Bookmark, FolderNode
+from frecency import FrecencyTable
+from reference_scorer import ReferenceScorer
+from search_engine import SearchEngine
+
+CJK_WORDS = ['流水线', '部署', '工作', '文档', '日志', '中国', '腾讯云', '监控', '测试', '发布', '重庆', '银行']
+LATIN_WORDS = ['Edge', 'EdgeOne', 'GitHub', 'ci', 'cls', 'docs', 'alpha-beta', 'Jenkins_ci', 'API', 'wiki', 'k8s', 'v2']
+SEPARATORS = [' ', ' ', ' ', '-', '_', '', ' | ', '/']
+
+MODES = ['serial', 'cached', 'budget', 'parallel', 'frecency', 'scoped']
+
+
+# ---------------------------------------------------------------------------
+# Generators
+# ---------------------------------------------------------------------------
+
+def random_text(rng, min_words, max_words):
+    words = [rng.choice(CJK_WORDS if rng.random() < 0.5 else LATIN_WORDS)
+             for _ in range(rng.randint(min_words, max_words))]
+    text = ''
+    for i, word in enumerate(words):
+        text += (rng.choice(SEPARATORS) if i else '') + word
+    return text
+
+
+def random_library(rng, size):
+    bookmarks = []
+    for i in range(size):
+        if bookmarks and rng.random() < 0.1:
+            # Duplicate names exercise the tie-breaking rules
+            name = rng.choice(bookmarks).name
+        else:
+            name = random_text(rng, 1, 4)
+        folder = '/'.join(random_text(rng, 1, 2) for _ in range(rng.randint(0, 3)))
+        bookmarks.append(Bookmark(name, f'https://example.com/{i}', folder=folder,
+                                  date_added=str(rng.randint(0, 10 ** 6)), id=str(i)))
+    return bookmarks
+
+
+def random_keyword(rng, text):
+    """Derive one keyword from text the way a user would type it"""
+    words = [w for w in text.replace('/', ' ').replace('|', ' ').split() if w] or ['x']
+    word = rng.choice(words)
+    form = rng.random()
+    if form < 0.25:
+        word = ''.join(lazy_pinyin(word, style=Style.NORMAL))
+    elif form < 0.45:
+        word = ''.join(lazy_pinyin(word, style=Style.FIRST_LETTER))
+    elif form < 0.6 and len(word) > 2:
+        start = rng.randint(1, min(3, len(word) - 1))
+        word = word[start:]
+    if rng.random() < 0.5:
+        word = word[:rng.randint(1, len(word))]
+    return word.lower() if rng.random() < 0.7 else word
+
+
+def random_query(rng, bookmarks):
+    if rng.random() < 0.1:
+        return random_text(rng, 1, 2)
+    target = rng.choice(bookmarks)
+    return ' '.join(random_keyword(rng, target.name if rng.random() < 0.7 or not target.folder else target.folder)
+                    for _ in range(rng.randint(1, 3)))
+
+
+def random_scope(rng, bookmarks):
+    """A "/a/b" or "in:a/b" token naming the tail of some bookmark's folder path"""
+    segments = [segment for segment in rng.choice(bookmarks).folder.split('/') if segment] or ['x']
+    tail = segments[rng.randint(0, len(segments) - 1):]
+    # Tokens cannot contain spaces, so multi-word folder names are typed as one word of them
+    path = '/'.join(random_keyword(rng, s) if ' ' in s or rng.random() < 0.3 else s for s in tail)
+    return ('in:' if rng.random() < 0.5 else '/') + path
+
+
+def folder_tree(bookmarks):
+    """
+    Lay a library out the way the parser does: each folder's subtree is one
+    contiguous slice of the bookmark list
+    Returns: (bookmarks in tree order, FolderNode list with subtree ranges)
+    """
+    def path_of(bookmark):
+        return tuple(segment for segment in bookmark.folder.split('/') if segment)
+
+    bookmarks = sorted(bookmarks, key=path_of)
+    nodes = {}
+    for i, bookmark in enumerate(bookmarks):
+        path = path_of(bookmark)
+        for depth in range(1, len(path) + 1):
+            node = nodes.get(path[:depth])
+            if node is None:
+                parent = nodes.get(path[:depth - 1])
+                node = FolderNode(path[depth - 1], '/'.join(path[:depth]), id=str(len(nodes)), parent=parent)
+                node.start = i
+                if parent is not None:
+                    parent.children.append(node)
+                nodes[path[:depth]] = node
+            node.end = i + 1
+    return bookmarks, list(nodes.values())
+
+
+def type_ahead(query):
+    """All prefixes of a query as they are typed, one keystroke at a time"""
+    return [query[:i] for i in range(1, len(query) + 1) if query[:i].strip()]
+
+
+# ---------------------------------------------------------------------------
+# Differential check
+# ---------------------------------------------------------------------------
+
+def ranking(results):
+    return [(bookmark.id, score) for bookmark, score in results]
+
+
+def wait_complete(engine, bookmarks, query, timeout=30.0):
+    """Poll a time-budgeted engine until the background search has cached the full result"""
+    end = time.monotonic() + timeout
+    while True:
+        results = engine.search(bookmarks, query, time_budget=1e-9)
+        if not results.partial or time.monotonic() > end:
+            return results
+        time.sleep(0.01)
+
+
+def check(mode, bookmarks, queries, engine_factory=SearchEngine, parallel_engine=None):
+    """
+    Replay queries through the optimized engine in the given mode
+    Returns: None if every query matches the reference, else a mismatch description
+    """
+    reference = ReferenceScorer()
+
+    if mode == 'parallel':
+        engine = parallel_engine
+    elif mode == 'frecency':
+        # Nothing launched yet: every boost is 0, so results must not change at all
+        engine = engine_factory(FrecencyTable(), parallel_workers=0)
+    else:
+        engine = engine_factory(parallel_workers=0)
+
+    folders = None
+    if mode == 'scoped':
+        bookmarks, folders = folder_tree(bookmarks)
+
+    passes = 2 if mode == 'cached' else 1
+    for _ in range(passes):
+        for query in queries:
+            library, reference_query = bookmarks, query
+            if mode == 'scoped':
+                scope, keywords = engine._split_scope(query.split())
+                if scope and not keywords:
+                    # Listing a folder without keywords is not a scored search
+                    continue
+                if scope:
+                    # The reference searches exactly the subtree slices the scope selects
+                    ranges, _ = engine._resolve_scope(folders, scope)
+                    library = [bookmarks[i] for start, end in ranges for i in range(start, end)]
+                    reference_query = ' '.join(keywords)
+            expected = ranking(reference.search(library, reference_query))
+
+            if mode == 'budget':
+                partial = engine.search(bookmarks, query, time_budget=1e-9)
+                for bookmark, score in partial:
+                    # Partial results may be incomplete, but never wrongly scored
+                    if score != reference.calculate_score(bookmark, query.split()):
+                        return f"query {query!r}: partial score {score} for {bookmark.id}"
+                actual = ranking(wait_complete(engine, bookmarks, query))
+            else:
+                actual = ranking(engine.search(bookmarks, query, folders=folders, time_budget=0))
+
+            if actual != expected:
+                return f"query {query!r}:\n    expected {expected}\n    actual   {actual}"
+
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Shrinking
+# ---------------------------------------------------------------------------
+
+def copy_library(bookmarks):
+    return [Bookmark(b.name, b.url, folder=b.folder, date_added=b.date_added, id=b.id) for b in bookmarks]
+
+
+def shrink_list(items, fails):
+    """Delta debugging: drop chunks of items while the failure persists"""
+    chunk = max(len(items) // 2, 1)
+    while chunk >= 1:
+        i = 0
+        changed = False
+        while i < len(items):
+            candidate = items[:i] + items[i + chunk:]
+            if candidate and fails(candidate):
+                items = candidate
+                changed = True
+            else:
+                i += chunk
+        if not changed:
+            chunk //= 2
+    return items
+
+
+def shrink_text(text, fails):
+    """Drop single characters while the failure persists"""
+    i = 0
+    while i < len(text):
+        candidate = text[:i] + text[i + 1:]
+        if fails(candidate):
+            text = candidate
+        else:
+            i += 1
+    return text
+
+
+def shrink(mode, bookmarks, queries, **kwargs):
+    """
+    Reduce a failing (library, queries) case to a minimal counterexample
+    Returns: (bookmarks, queries, mismatch description)
+    """
+    def fails(library, qs):
+        return check(mode, copy_library(library), qs, **kwargs) is not None
+
+    queries = shrink_list(queries, lambda qs: fails(bookmarks, qs))
+    bookmarks = shrink_list(bookmarks, lambda lib: fails(lib, queries))
+
+    for i in range(len(bookmarks)):
+        def with_field(field, value, i=i):
+            library = copy_library(bookmarks)
+            setattr(library[i], field, value)
+            return library
+
+        bookmarks = with_field('folder', shrink_text(bookmarks[i].folder,
+                                                     lambda t: fails(with_field('folder', t), queries)))
+        bookmarks = with_field('name', shrink_text(bookmarks[i].name,
+                                                   lambda t: fails(with_field('name', t), queries)))
+
+    for i in range(len(queries)):
+        queries = queries[:i] + [shrink_text(queries[i], lambda t: bool(t.strip()) and
+                                             fails(bookmarks, queries[:i] + [t] + queries[i + 1:]))] + queries[i + 1:]
+
+    return bookmarks, queries, check(mode, copy_library(bookmarks), queries, **kwargs)
+
+
+def format_counterexample(mode, bookmarks, queries, mismatch):
+    lines = [f"Minimal counterexample (mode={mode}):", "  bookmarks = ["]
+    for b in bookmarks:
+        lines.append(f"    Bookmark(name={b.name!r}, folder={b.folder!r}, id={b.id!r}, date_added={b.date_added!r}),")
+    lines.append("  ]")
+    lines.append(f"  queries = {queries!r}")
+    lines.append(f"  {mismatch}")
+    return '\n'.join(lines)
+
+
+def run_differential(mode, seed, iterations, library_size=(1, 60), **kwargs):
+    """
+    Run randomized differential checks
+    Returns: None on success, else a formatted minimal counterexample
+    """
+    rng = random.Random(seed)
+    for _ in range(iterations):
+        bookmarks = random_library(rng, rng.randint(*library_size))
+        queries = [q for _ in range(rng.randint(1, 3)) for q in type_ahead(random_query(rng, bookmarks))]
+        if mode == 'scoped':
+            # Type the keywords after a fixed folder scope, as a user would
+            scope = random_scope(rng, bookmarks)
+            queries = [f'{scope} {q}' for q in queries]
+
+        if check(mode, copy_library(bookmarks), queries, **kwargs) is not None:
+            return format_counterexample(mode, *shrink(mode, bookmarks, queries, **kwargs))
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+def test_serial_matches_reference():
+    failure = run_differential('serial', seed=1, iterations=60)
+    assert failure is None, failure
+
+
+def test_cached_type_ahead_matches_reference():
+    failure = run_differential('cached', seed=2, iterations=30)
+    assert failure is None, failure
+
+
+def test_time_budget_matches_reference():
+    # Large enough libraries for the deadline checks to actually cut a search short
+    failure = run_differential('budget', seed=3, iterations=4, library_size=(300, 400))
+    assert failure is None, failure
+
+
+def test_parallel_matches_reference():
+    engine = SearchEngine(parallel_workers=2, parallel_min_corpus=0)
+    try:
+        failure = run_differential('parallel', seed=4, iterations=8, parallel_engine=engine)
+    finally:
+        engine._parallel.close()
+    assert failure is None, failure
+
+
+def test_empty_frecency_table_matches_reference():
+    failure = run_differential('frecency', seed=6, iterations=30)
+    assert failure is None, failure
+
+
+def test_scoped_search_matches_reference_on_subtree():
+    failure = run_differential('scoped', seed=7, iterations=40)
+    assert failure is None, failure
+
+
+class BrokenEngine(SearchEngine):
+    """Deliberately mis-tuned engine: prefix matches score 84 instead of 85"""
+
+    def _score_text(self, text, keyword):
+        score = super()._score_text(text, keyword)
+        return 84.0 if score == 85.0 else score
+
+
+def test_mismatch_is_shrunk():
+    failure = run_differential('serial', seed=5, iterations=60, engine_factory=BrokenEngine)
+    assert failure is not None
+
+    # The counterexample is reduced to a single bookmark and one short query
+    assert failure.count('Bookmark(') == 1, failure
+    queries = ast.literal_eval(failure.split('queries = ')[1].split('\n')[0])
+    assert len(queries) == 1 and len(queries[0]) <= 3, failure
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Randomized differential test against the reference scorer")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=int(time.time()))
+    parser.add_argument('--modes', nargs='+', default=MODES, choices=MODES)
+    args = parser.parse_args()
+
+    failed = False
+    for mode in args.modes:
+        kwargs = {}
+        if mode == 'parallel':
+            kwargs['parallel_engine'] = SearchEngine(parallel_workers=2, parallel_min_corpus=0)
+        size = (300, 400) if mode == 'budget' else (1, 60)
+        iterations = max(args.iterations // 20, 1) if mode == 'budget' else args.iterations
+
+        start = time.perf_counter()
+        failure = run_differential(mode, args.seed, iterations, library_size=size, **kwargs)
+        elapsed = time.perf_counter() - start
+        if failure:
+            failed = True
+            print(f"✗ {mode}: mismatch (seed {args.seed})\n{failure}")
+        else:
+            print(f"✓ {mode}: {iterations} libraries identical ({elapsed:.1f}s, seed {args.seed})")
+
+        if 'parallel_engine' in kwargs:
+            kwargs['parallel_engine']._parallel.close()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
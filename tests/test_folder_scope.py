@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test folder-scoped queries ("/work/ci lsx", "in:工作 lsx") on a synthetic bookmark file
+"""
+import json
+import os
+import sys
+
+# Add source directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from bookmark_parser import BookmarkParser
+from search_engine import SearchEngine
+
+
+def _url(id, name):
+    return {'type': 'url', 'id': id, 'name': name, 'url': f'https://example.com/{id}'}
+
+
+def _folder(id, name, children):
+    return {'type': 'folder', 'id': id, 'name': name, 'children': children}
+
+
+SAMPLE = {
+    'roots': {
+        'bookmark_bar': _folder('1', 'Bookmarks bar', [
+            _folder('10', '工作', [
+                _url('11', 'EdgeOne 流水线'),
+                _folder('12', 'ci', [
+                    _url('13', '部署流水线'),
+                    _url('14', 'Jenkins'),
+                ]),
+            ]),
+            _folder('20', 'work', [
+                _folder('21', 'ci', [
+                    _url('22', 'GitHub Actions 流水线'),
+                ]),
+                _url('23', 'Work Wiki'),
+            ]),
+            _url('30', '流水线 Personal'),
+            _folder('40', 'Social', [
+                _url('41', '流水线 Share'),
+            ]),
+            _folder('50', 'GitHub Actions', [
+                _url('51', 'Deploy runbook'),
+            ]),
+            _folder('60', 'My Work', [
+                _url('61', 'Weekly notes'),
+            ]),
+            _folder('70', '工作 Docs', [
+                _url('71', 'API reference'),
+            ]),
+        ]),
+        'other': _folder('2', 'Other bookmarks', []),
+    }
+}
+
+
+def load(tmp_path):
+    path = tmp_path / 'Bookmarks'
+    path.write_text(json.dumps(SAMPLE, ensure_ascii=False), encoding='utf-8')
+    parser = BookmarkParser(str(path))
+    return parser.parse(), parser.folders
+
+
+def names(results):
+    return {bookmark.name for bookmark, score in results}
+
+
+def test_folder_ranges(tmp_path):
+    bookmarks, folders = load(tmp_path)
+    by_id = {folder.id: folder for folder in folders}
+
+    for folder in folders:
+        for bookmark in bookmarks[folder.start:folder.end]:
+            assert bookmark.folder.startswith(folder.path)
+
+    assert [b.id for b in bookmarks[by_id['10'].start:by_id['10'].end]] == ['11', '13', '14']
+    assert by_id['2'].start == by_id['2'].end
+
+
+def test_unscoped_searches_everything(tmp_path):
+    bookmarks, folders = load(tmp_path)
+    results = SearchEngine().search(bookmarks, 'lsx', folders)
+    assert names(results) == {'EdgeOne 流水线', '部署流水线', 'GitHub Actions 流水线', '流水线 Personal', '流水线 Share'}
+
+
+def test_path_scope(tmp_path):
+    bookmarks, folders = load(tmp_path)
+    engine = SearchEngine()
+
+    assert names(engine.search(bookmarks, '/work/ci lsx', folders)) == {'GitHub Actions 流水线'}
+    assert names(engine.search(bookmarks, '/ci lsx', folders)) == {'部署流水线', 'GitHub Actions 流水线'}
+
+
+def test_pinyin_scope(tmp_path):
+    bookmarks, folders = load(tmp_path)
+    engine = SearchEngine()
+
+    assert names(engine.search(bookmarks, 'in:工作 lsx', folders)) == {'EdgeOne 流水线', '部署流水线'}
+    assert names(engine.search(bookmarks, 'in:gz lsx', folders)) == {'EdgeOne 流水线', '部署流水线'}
+    assert names(engine.search(bookmarks, 'in:gongzuo/ci lsx', folders)) == {'部署流水线'}
+
+
+def test_scope_only_lists_subtree(tmp_path):
+    bookmarks, folders = load(tmp_path)
+    results = SearchEngine().search(bookmarks, 'in:gz', folders)
+    assert [bookmark.id for bookmark, score in results] == ['11', '13', '14', '71']
+
+
+def test_scope_ignores_substring_matches(tmp_path):
+    bookmarks, folders = load(tmp_path)
+    engine = SearchEngine()
+
+    # "ci" is inside "Social" but is not a word, prefix or pinyin match
+    assert names(engine.search(bookmarks, '/ci lsx', folders)) == {'部署流水线', 'GitHub Actions 流水线'}
+    assert names(engine.search(bookmarks, '/soc lsx', folders)) == {'流水线 Share'}
+
+
+def test_scope_word_prefix(tmp_path):
+    bookmarks, folders = load(tmp_path)
+    engine = SearchEngine()
+
+    # Prefixes of later words count, on the name and on its pinyin
+    assert names(engine.search(bookmarks, '/act', folders)) == {'Deploy runbook'}
+    assert names(engine.search(bookmarks, '/wo', folders)) == {'GitHub Actions 流水线', 'Work Wiki', 'Weekly notes'}
+    assert names(engine.search(bookmarks, '/docs', folders)) == {'API reference'}
+    assert names(engine.search(bookmarks, 'in:gz', folders)) == {'EdgeOne 流水线', '部署流水线', 'Jenkins',
+                                                                 'API reference'}
+
+
+def test_unknown_scope(tmp_path):
+    bookmarks, folders = load(tmp_path)
+    assert SearchEngine().search(bookmarks, '/nothing lsx', folders) == []
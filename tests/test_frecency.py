@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test the launch frecency table and its effect on ranking
+"""
+import os
+import sys
+import time
+
+# Add source directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from bookmark_parser import Bookmark, CHROME_EPOCH_OFFSET
+from frecency import FrecencyTable
+from search_engine import SearchEngine
+import config
+
+DAY = 86400
+
+
+def test_decay_and_persistence(tmp_path):
+    path = tmp_path / 'frecency.json'
+    table = FrecencyTable(str(path))
+    now = time.time()
+    table.record('42', now=now)
+    table.record('42', now=now)
+
+    assert table.score('42', now=now) == 2.0
+    assert abs(table.score('42', now=now + config.FRECENCY_HALF_LIFE_DAYS * DAY) - 1.0) < 1e-9
+
+    reloaded = FrecencyTable(str(path))
+    assert abs(reloaded.score('42') - 2.0) < 0.01
+    assert reloaded.score('missing') == 0.0
+
+
+def test_boost_saturates():
+    table = FrecencyTable()
+    now = 1000.0
+    boosts = []
+    for _ in range(20):
+        table.record('1', now=now)
+        boosts.append(table.boost('1', now=now))
+
+    assert boosts == sorted(boosts)
+    assert 0 < boosts[0] < config.FRECENCY_MAX_BOOST
+    assert boosts[-1] <= config.FRECENCY_MAX_BOOST
+
+
+def test_last_used_seeds_score():
+    table = FrecencyTable()
+    now = 1000.0 + 30 * DAY
+    assert table.score('1', last_used=now - DAY, now=now) > table.score('1', last_used=now - 20 * DAY, now=now)
+
+
+def test_launched_bookmark_ranks_first():
+    bookmarks = [
+        Bookmark('Jenkins Build', 'https://a', id='1'),
+        Bookmark('Jenkins Deploy', 'https://b', id='2'),
+    ]
+    table = FrecencyTable()
+    engine = SearchEngine(table)
+
+    assert engine.search(bookmarks, 'jenkins', time_budget=0)[0][0].id == '1'
+
+    for _ in range(3):
+        table.record('2')
+    ranked = engine.search(bookmarks, 'jenkins', time_budget=0)
+    assert ranked[0][0].id == '2'
+    assert ranked[0][1] > ranked[1][1]
+
+
+def test_edge_last_used_boost():
+    # Edge stores date_last_used as microseconds since 1601
+    yesterday = str(int((time.time() - DAY + CHROME_EPOCH_OFFSET) * 1000000))
+    bookmarks = [
+        Bookmark('Wiki Home', 'https://a', id='1'),
+        Bookmark('Wiki Page', 'https://b', id='2', date_last_used=yesterday),
+    ]
+    ranked = SearchEngine(FrecencyTable()).search(bookmarks, 'wiki', time_budget=0)
+    assert [bookmark.id for bookmark, score in ranked] == ['2', '1']
+
+
+def test_boost_only_orders_equal_matches():
+    bookmarks = [Bookmark(f'Git mirror {i}', f'https://m{i}', id=str(i)) for i in range(10)]
+    bookmarks.append(Bookmark('Gitlab', 'https://gitlab', id='gitlab'))
+    table = FrecencyTable()
+    for _ in range(20):
+        table.record('gitlab')
+    table.record('9')
+
+    # A launched bookmark never jumps over better text matches
+    ranked = SearchEngine(table).search(bookmarks, 'git', time_budget=0)
+    assert [bookmark.id for bookmark, score in ranked] == ['9'] + [str(i) for i in range(9)]
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test that sharded scoring in the worker pool matches the single-process path
+"""
+import multiprocessing
+import os
+import sys
+import time
+
+# Add source directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import parallel_search
+import search_engine
+from bookmark_parser import Bookmark
+from frecency import FrecencyTable
+from search_engine import SearchEngine
+
+WORDS = ['Edge', 'EdgeOne', '流水线', '部署', 'GitHub', 'Jenkins', 'wiki', '文档', 'cls', '日志', 'alpha-beta']
+QUERIES = ['lsx', 'edge', 'eo cls', 'wiki 文档', 'gh', 'rz', 'alpha beta', 'nothing']
+
+
+def make_bookmarks(count=3000):
+    bookmarks = []
+    for i in range(count):
+        name = ' '.join(WORDS[(i * k + k) % len(WORDS)] for k in (1, 3, 7)[:i % 3 + 1])
+        folder = '/'.join(WORDS[(i + k) % len(WORDS)] for k in range(i % 3))
+        bookmarks.append(Bookmark(name, f'https://example.com/{i}', folder=folder,
+                                  date_added=str(i * 7919 % count), id=str(i)))
+    return bookmarks
+
+
+def test_parallel_matches_serial():
+    bookmarks = make_bookmarks()
+    serial = SearchEngine(parallel_workers=0)
+    parallel = SearchEngine(parallel_workers=2, parallel_min_corpus=100)
+    try:
+        for query in QUERIES:
+            expected = serial.search(bookmarks, query, time_budget=0)
+            actual = parallel.search(bookmarks, query, time_budget=0)
+            assert [(b.id, s) for b, s in actual] == [(b.id, s) for b, s in expected], query
+    finally:
+        parallel._parallel.close()
+
+
+def test_boost_change_keeps_text_block():
+    bookmarks = make_bookmarks()
+    frecency = FrecencyTable()
+    serial = SearchEngine(frecency, parallel_workers=0)
+    parallel = SearchEngine(frecency, parallel_workers=2, parallel_min_corpus=100)
+    try:
+        before = {b.id: s for b, s in parallel.search(bookmarks, 'edge', time_budget=0)}
+        target = min(before, key=before.get)
+        corpus, boosts = parallel._parallel._corpus.name, parallel._parallel._boost_block.name
+
+        # Unchanged boosts publish nothing, a launch only replaces the boosts block
+        parallel._parallel.load(bookmarks, parallel._boosts)
+        assert parallel._parallel._boost_block.name == boosts
+        frecency.record(target)
+        actual = parallel.search(bookmarks, 'edge', time_budget=0)
+        assert parallel._parallel._corpus.name == corpus
+        assert parallel._parallel._boost_block.name != boosts
+
+        expected = serial.search(bookmarks, 'edge', time_budget=0)
+        assert [(b.id, s) for b, s in actual] == [(b.id, s) for b, s in expected]
+        assert dict((b.id, s) for b, s in actual)[target] > before[target]
+    finally:
+        parallel._parallel.close()
+
+
+def test_small_library_stays_single_process():
+    engine = SearchEngine(parallel_workers=2, parallel_min_corpus=10000)
+    engine.search(make_bookmarks(50), 'edge', time_budget=0)
+    assert engine._parallel._pool is None
+
+
+def test_stale_shards_are_skipped():
+    parallel_search._init_worker(multiprocessing.Value('q', 5, lock=False))
+    task = ('missing', 'missing', 0, ['edge'], b'', 10, 60, 4)
+    assert parallel_search._score_shard(task) == []
+
+
+def test_new_query_stops_stale_parallel_search():
+    bookmarks = make_bookmarks(20000)
+    engine = SearchEngine(parallel_workers=2, parallel_min_corpus=100)
+    try:
+        engine.search(bookmarks, 'nothing', time_budget=0)
+        assert engine.search(bookmarks, 'edge', time_budget=1e-9).partial
+        stale = engine._worker
+
+        engine.search(bookmarks, 'wiki', time_budget=0)
+        stale.join(timeout=10)
+        assert not stale.is_alive()
+        assert engine._cache_get(('edge',)) is None
+    finally:
+        engine._parallel.close()
+
+
+def _broken_init(generation):
+    raise RuntimeError('worker cannot start')
+
+
+def test_broken_workers_fall_back_to_single_process(monkeypatch):
+    monkeypatch.setattr(parallel_search, '_init_worker', _broken_init)
+    monkeypatch.setattr(parallel_search, 'WORKER_START_TIMEOUT', 3)
+    bookmarks = make_bookmarks(500)
+    expected = SearchEngine(parallel_workers=0).search(bookmarks, 'edge', time_budget=0)
+
+    engine = SearchEngine(parallel_workers=2, parallel_min_corpus=100)
+    actual = engine.search(bookmarks, 'edge', time_budget=0)
+    assert [(b.id, s) for b, s in actual] == [(b.id, s) for b, s in expected]
+    assert engine._parallel is None
+
+
+def _stalled_shard(task):
+    time.sleep(30)
+
+
+def test_stalled_workers_fall_back_to_single_process(monkeypatch):
+    monkeypatch.setattr(search_engine, 'SHARD_TIMEOUT', 1)
+    bookmarks = make_bookmarks(500)
+    expected = SearchEngine(parallel_workers=0).search(bookmarks, 'edge', time_budget=0)
+
+    engine = SearchEngine(parallel_workers=2, parallel_min_corpus=100)
+    engine.search(bookmarks, 'warm up', time_budget=0)
+    monkeypatch.setattr(parallel_search, '_score_shard', _stalled_shard)
+    actual = engine.search(bookmarks, 'edge', time_budget=0)
+    assert [(b.id, s) for b, s in actual] == [(b.id, s) for b, s in expected]
+    assert engine._parallel is None
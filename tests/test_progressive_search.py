@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test deadline-bounded search: partial results and background completion
+"""
+import os
+import sys
+import time
+
+# Add source directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from bookmark_parser import Bookmark
+from search_engine import SearchEngine
+
+
+def make_bookmarks(count=5000):
+    return [
+        Bookmark(f'Project {i} 流水线', f'https://example.com/{i}', folder='工作/ci',
+                 date_added=str(13300000000000000 + i), id=str(i))
+        for i in range(count)
+    ]
+
+
+def wait_for_cache(engine, bookmarks, query, timeout=10.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        results = engine.search(bookmarks, query, time_budget=1e-9)
+        if not results.partial:
+            return results
+        time.sleep(0.05)
+    raise AssertionError('background search did not finish')
+
+
+def test_unbounded_search_is_complete():
+    bookmarks = make_bookmarks(500)
+    results = SearchEngine().search(bookmarks, 'project lsx', time_budget=0)
+    assert not results.partial
+    assert len(results) == 10
+
+
+def test_partial_results_then_background_completion():
+    bookmarks = make_bookmarks()
+    expected = SearchEngine().search(bookmarks, 'project lsx', time_budget=0)
+
+    engine = SearchEngine()
+    partial = engine.search(bookmarks, 'project lsx', time_budget=1e-9)
+    assert partial.partial
+    # Recently added bookmarks are scored first
+    assert all(int(bookmark.id) >= len(bookmarks) - 1000 for bookmark, score in partial)
+
+    complete = wait_for_cache(engine, bookmarks, 'project lsx')
+    assert [(b.id, s) for b, s in complete] == [(b.id, s) for b, s in expected]
+
+
+def test_new_query_stops_stale_background_search():
+    bookmarks = make_bookmarks(20000)
+    engine = SearchEngine()
+    assert engine.search(bookmarks, 'project lsx', time_budget=1e-9).partial
+    stale = engine._worker
+
+    # Even a search that finishes in time supersedes the older background job
+    engine.search(bookmarks, 'nothing', time_budget=0)
+    stale.join(timeout=10)
+    assert not stale.is_alive()
+    assert engine._cache_get(('project', 'lsx')) is None
+
+
+def test_typing_builds_on_earlier_keystrokes():
+    names = ['Project {} 流水线', 'Jenkins {} 流水线', 'Edge wiki {}', 'Weekly notes {}']
+    bookmarks = [
+        Bookmark(names[i % 4].format(i), f'https://example.com/{i}', folder='工作',
+                 date_added=str(13300000000000000 + i), id=str(i))
+        for i in range(2000)
+    ]
+    expected = SearchEngine().search(bookmarks, 'lsx jen', time_budget=0)
+
+    engine = SearchEngine()
+    query = 'lsx jen'
+    for end in range(1, len(query) + 1):
+        engine.search(bookmarks, query[:end], time_budget=0.02)
+        time.sleep(0.05)
+
+    complete = wait_for_cache(engine, bookmarks, query)
+    assert [(b.id, s) for b, s in complete] == [(b.id, s) for b, s in expected]
+
+    # Extending the query only rescores bookmarks mentioning every earlier keyword
+    candidates = engine._narrow((), ['lsx', 'jenkins'], engine._order)
+    assert sorted(candidates) == [i for i in range(len(bookmarks)) if i % 4 == 1]
+    assert engine._narrow((), ['wiki'], engine._order) is engine._order
+
+
+def test_cache_invalidated_on_reload():
+    bookmarks = make_bookmarks(200)
+    engine = SearchEngine()
+    engine.search(bookmarks, 'project', time_budget=0)
+
+    reloaded = [Bookmark('Other', 'https://example.com/other', id='x')]
+    assert list(engine.search(reloaded, 'project', time_budget=0)) == []
+
+
+def test_equal_ties_keep_bookmark_order():
+    bookmarks = [
+        Bookmark('Wiki', 'https://example.com/a', id='a', date_added='13300000000000000'),
+        Bookmark('Wiki', 'https://example.com/b', id='b', date_added='13300000000000001'),
+    ]
+    results = SearchEngine().search(bookmarks, 'wiki', time_budget=0)
+    assert [bookmark.id for bookmark, score in results] == ['a', 'b']
+
+
+def test_stale_epoch_is_not_cached():
+    engine = SearchEngine()
+    engine.search(make_bookmarks(200), 'project', time_budget=0)
+    epoch = engine._epoch
+
+    # A background search finishing after a reload must not fill the new cache
+    engine.search(make_bookmarks(100), 'other', time_budget=0)
+    engine._cache_put(('project',), [], epoch)
+    assert engine._cache_get(('project',)) is None
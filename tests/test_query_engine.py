@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test the headless query engine and the JSON lines CLI
+"""
+import io
+import json
+import os
+import sys
+
+# Add source directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import config
+import edge_helper_cli
+from frecency import FrecencyTable
+from query_engine import QueryEngine
+
+SAMPLE = {
+    'roots': {
+        'bookmark_bar': {'type': 'folder', 'id': '1', 'name': 'Bookmarks bar', 'children': [
+            {'type': 'folder', 'id': '10', 'name': '工作', 'children': [
+                {'type': 'url', 'id': '11', 'name': 'EdgeOne 流水线', 'url': 'https://a.example.com'},
+                {'type': 'url', 'id': '12', 'name': 'Jenkins', 'url': 'https://b.example.com'},
+            ]},
+            {'type': 'url', 'id': '20', 'name': 'GitHub', 'url': 'https://c.example.com'},
+        ]},
+    }
+}
+
+
+def write_sample(tmp_path):
+    path = tmp_path / 'Bookmarks'
+    path.write_text(json.dumps(SAMPLE, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+def test_trigger_handling(tmp_path):
+    engine = QueryEngine(write_sample(tmp_path))
+
+    assert engine.match('github') == []
+    assert engine.match(f'{config.TRIGGER_KEYWORD} ') == []
+    assert [m[1] for m in engine.match(f'{config.TRIGGER_KEYWORD} github')] == ['GitHub']
+
+
+def test_match_format(tmp_path):
+    engine = QueryEngine(write_sample(tmp_path))
+    match_id, text, icon, relevance, relevance_score, properties = engine.match('b lsx')[0]
+
+    assert match_id == 'bookmark_11_https://a.example.com'
+    assert text == 'EdgeOne 流水线'
+    assert 0 < relevance <= 100 and 0 < relevance_score <= 1
+    assert properties == {'subtext': 'Bookmarks bar/工作 | https://a.example.com',
+                          'urls': ['https://a.example.com']}
+
+
+def test_relevance_scale(tmp_path):
+    frecency = FrecencyTable()
+    engine = QueryEngine(write_sample(tmp_path), frecency)
+
+    assert engine.match('b github')[0][3:5] == (100, 1.0)
+    relevance, relevance_score = engine.match('b git')[0][3:5]
+    assert relevance_score == relevance / 100
+
+    # The boost only orders matches with the same text score
+    engine.launch('bookmark_20_https://c.example.com')
+    boosted_relevance, boosted_score = engine.match('b git')[0][3:5]
+    assert boosted_relevance == relevance
+    assert relevance / 100 < boosted_score < (relevance + 1) / 100
+
+
+def test_launch_records_frecency(tmp_path):
+    frecency = FrecencyTable()
+    engine = QueryEngine(write_sample(tmp_path), frecency)
+
+    assert engine.launch('bookmark_12_https://b.example.com') == 'https://b.example.com'
+    assert frecency.score('12') > 0
+    assert engine.launch('garbage') is None
+
+
+def test_reload_on_modification(tmp_path):
+    path = write_sample(tmp_path)
+    engine = QueryEngine(path)
+    assert engine.match('b wiki') == []
+
+    updated = json.loads(json.dumps(SAMPLE))
+    updated['roots']['bookmark_bar']['children'].append(
+        {'type': 'url', 'id': '30', 'name': 'Wiki', 'url': 'https://d.example.com'})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(updated, f)
+    os.utime(path, (engine.parser._last_modified + 10, engine.parser._last_modified + 10))
+
+    assert [m[1] for m in engine.match('b wiki')] == ['Wiki']
+
+
+def test_cli_json_lines(tmp_path, monkeypatch):
+    queries = tmp_path / 'trace.txt'
+    queries.write_text('l\nls\nlsx\nin:gz j\n', encoding='utf-8')
+    snapshot = tmp_path / 'snapshot.json'
+    out = io.StringIO()
+
+    args = edge_helper_cli.parse_args(['--bookmarks', write_sample(tmp_path), '--queries', str(queries),
+                                       '--no-trigger', '--time-budget', '0', '--workers', '0',
+                                       '--tracemalloc', '--save-snapshot', str(snapshot)])
+    assert edge_helper_cli.run(args, out) == 0
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r['query'] for r in records] == ['b l', 'b ls', 'b lsx', 'b in:gz j']
+    assert all(r['elapsed_ms'] >= 0 and not r['partial'] and 'memory' in r for r in records)
+    assert records[2]['results'][0]['text'] == 'EdgeOne 流水线'
+    assert [r['text'] for r in records[3]['results']] == ['Jenkins']
+    assert json.loads(snapshot.read_text(encoding='utf-8')) == SAMPLE
+
+
+def test_cli_missing_bookmark_file(tmp_path, capsys):
+    snapshot = tmp_path / 'snapshot.json'
+    code = edge_helper_cli.main(['--bookmarks', str(tmp_path / 'missing'), '--queries', os.devnull,
+                                 '--save-snapshot', str(snapshot)])
+
+    assert code == 1
+    assert 'bookmark file not found' in capsys.readouterr().err
+    assert not snapshot.exists()
+
+
+def test_cli_corrupt_bookmark_file(tmp_path, capsys):
+    path = tmp_path / 'Bookmarks'
+    path.write_text('{"roots": {"bookmark_bar":', encoding='utf-8')
+    snapshot = tmp_path / 'snapshot.json'
+    code = edge_helper_cli.main(['--bookmarks', str(path), '--queries', os.devnull,
+                                 '--save-snapshot', str(snapshot)])
+
+    assert code == 1
+    assert 'could not load bookmarks' in capsys.readouterr().err
+    assert not snapshot.exists()
@@ -6,6 +6,7 @@ set -e
 PLUGIN_DIR="$HOME/.local/share/krunner/dbusplugins/krunner-edge-helper"
 DBUSPLUGINS_DIR="$HOME/.local/share/krunner/dbusplugins"
 DBUS_SERVICE_DIR="$HOME/.local/share/dbus-1/services"
+DATA_DIR="$HOME/.local/share/krunner-edge-helper"
 
 echo "=== KRunner Edge Helper Uninstallation ==="
 echo
@@ -47,9 +48,15 @@ echo "5. Removing log file..."
 rm -f /tmp/krunner_edge_helper.log
 echo "   ✓ Log file removed"
 
-# Step 6: Restart KRunner
+# Step 6: Remove launch history
 echo
-echo "6. Restarting KRunner..."
+echo "6. Removing launch history..."
+rm -rf "$DATA_DIR"
+echo "   ✓ Launch history removed"
+
+# Step 7: Restart KRunner
+echo
+echo "7. Restarting KRunner..."
 killall krunner 2>/dev/null || true
 kquitapp5 krunner 2>/dev/null || kquitapp6 krunner 2>/dev/null || true
 sleep 2